@@ -2,9 +2,13 @@ import os
 import json
 import inspect
 import re
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Callable, Optional
 from openai import OpenAI
 from dotenv import load_dotenv
+from budget import RunBudget, DeadlineExceeded, BudgetExceeded
 
 load_dotenv()
 
@@ -107,14 +111,42 @@ class RunResult:
 # Runner
 # -----------------------------
 
+# Blocking API and tool calls run here rather than on the loop's default
+# executor: asyncio.run() joins the default executor on shutdown, so a call
+# abandoned at the deadline would hold up the caller until it finished.
+BLOCKING_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="blocking-call")
+
+
+async def _run_blocking(func: Callable, budget: Optional[RunBudget] = None):
+    """Runs a blocking call in a worker thread, bounded by the budget's deadline."""
+    timeout = budget.remaining() if budget is not None else None
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(
+            loop.run_in_executor(BLOCKING_EXECUTOR, func),
+            timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("Deadline exceeded while waiting for a blocking call")
+
+
 class Runner:
     async def run(
         self,
         agent: Agent,
         messages: List[Dict[str, str]],
         context_variables: Optional[Dict[str, Any]] = None,
-        max_iterations: int = 5
+        max_iterations: int = 5,
+        budget: Optional[RunBudget] = None,
+        stop_after_tools: bool = False
     ) -> RunResult:
+        """
+        Runs the agent, falling back through FALLBACK_MODELS on errors.
+
+        With `stop_after_tools`, the run ends once the first round of tool
+        calls has executed, for callers that only need the tools' side
+        effects (e.g. results recorded in `context_variables`).
+        """
 
         if context_variables is None:
             context_variables = {}
@@ -155,11 +187,23 @@ class Runner:
                     if use_parse:
                         kwargs["response_format"] = agent.output_type
 
+                    call_client = client
+                    if budget is not None:
+                        budget.charge_model_call()
+                        remaining = budget.remaining()
+                        if remaining is not None:
+                            # Retries would overrun the deadline
+                            call_client = client.with_options(timeout=remaining, max_retries=0)
+
+                    if use_parse:
+                        call = functools.partial(call_client.beta.chat.completions.parse, **kwargs)
+                    else:
+                        call = functools.partial(call_client.chat.completions.create, **kwargs)
+
                     try:
-                        if use_parse:
-                            response = client.beta.chat.completions.parse(**kwargs)
-                        else:
-                            response = client.chat.completions.create(**kwargs)
+                        response = await _run_blocking(call, budget)
+                    except (DeadlineExceeded, BudgetExceeded):
+                        raise
                     except Exception as call_error:
                         print(f"DEBUG: API call failed for {model_name}: {call_error}")
                         raise
@@ -234,9 +278,11 @@ class Runner:
                             print(f"DEBUG: Agent '{agent.name}' calling tool '{tool_name}'")
 
                             if "context_variables" in inspect.signature(target_tool).parameters:
-                                result = target_tool(**tool_args, context_variables=context_variables)
+                                call = functools.partial(target_tool, **tool_args, context_variables=context_variables)
                             else:
-                                result = target_tool(**tool_args)
+                                call = functools.partial(target_tool, **tool_args)
+
+                            result = await _run_blocking(call, budget)
 
                             all_messages.append({
                                 "role": "tool",
@@ -245,6 +291,14 @@ class Runner:
                                 "content": json.dumps(result, ensure_ascii=False),
                             })
 
+                    if stop_after_tools:
+                        return RunResult(message=message)
+
+            except (DeadlineExceeded, BudgetExceeded) as e:
+                # No point falling back to another model
+                print(f"ERROR: Agent '{agent.name}' stopped: {e}")
+                raise
+
             except Exception as e:
                 print(f"ERROR: Model '{model_name}' failed: {e}")
                 if model_name == models_to_try[-1]:
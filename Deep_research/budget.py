@@ -0,0 +1,87 @@
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(RuntimeError):
+    """Raised when a run's wall-clock deadline has passed."""
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised when a run has used up its model-call budget."""
+
+
+class RunBudget:
+    """
+    Wall-clock deadline and model-call budget shared by one research run.
+
+    A budget can be sliced into a child with a tighter deadline or call cap
+    (e.g. for a single phase). Calls charged to a child count against every
+    ancestor, and a child never outlives its parent.
+    """
+
+    def __init__(
+        self,
+        seconds: Optional[float] = None,
+        max_model_calls: Optional[int] = None,
+        parent: Optional["RunBudget"] = None
+    ):
+        now = time.monotonic()
+        self.started_at = now
+        self.parent = parent
+        self.max_model_calls = max_model_calls
+        self.model_calls = 0
+
+        self.expires_at = now + max(0.0, seconds) if seconds is not None else None
+        if parent is not None and parent.expires_at is not None:
+            if self.expires_at is None or parent.expires_at < self.expires_at:
+                self.expires_at = parent.expires_at
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None if there is no deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def limited(self) -> bool:
+        """Whether this budget or an ancestor sets a deadline or call cap."""
+        if self.expires_at is not None or self.max_model_calls is not None:
+            return True
+        return self.parent is not None and self.parent.limited()
+
+    def calls_left(self) -> Optional[int]:
+        """Model calls left across this budget and its ancestors, or None if unlimited."""
+        left = None
+        if self.max_model_calls is not None:
+            left = max(0, self.max_model_calls - self.model_calls)
+        if self.parent is not None:
+            parent_left = self.parent.calls_left()
+            if parent_left is not None and (left is None or parent_left < left):
+                left = parent_left
+        return left
+
+    def charge_model_call(self):
+        """Records one model call, raising if the deadline or call budget is spent."""
+        if self.expired():
+            raise DeadlineExceeded("Deadline exceeded before model call")
+        if self.calls_left() == 0:
+            raise BudgetExceeded("Model-call budget exhausted")
+
+        budget = self
+        while budget is not None:
+            budget.model_calls += 1
+            budget = budget.parent
+
+    def slice(
+        self,
+        seconds: Optional[float] = None,
+        max_model_calls: Optional[int] = None
+    ) -> "RunBudget":
+        """Returns a child budget bounded by both these limits and its own."""
+        return RunBudget(seconds=seconds, max_model_calls=max_model_calls, parent=self)
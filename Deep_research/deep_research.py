@@ -1,7 +1,7 @@
 import streamlit as st
 import asyncio
 from dotenv import load_dotenv
-from research_manager import ResearchManager
+from research_manager import ResearchManager, RunMetadata
 from writer_agent import ReportData
 
 load_dotenv(override=True)
@@ -26,6 +26,9 @@ if "manager" not in st.session_state:
 if "status_log" not in st.session_state:
     st.session_state.status_log = []
 
+if "run_metadata" not in st.session_state:
+    st.session_state.run_metadata = None
+
 
 # -----------------------------
 # Async helpers
@@ -43,14 +46,16 @@ def run_async(coro):
         return asyncio.run(coro)
 
 
-async def run_research(user_query: str):
+async def run_research(user_query: str, deadline=None):
     manager = st.session_state.manager
     status_placeholder = st.empty()
 
-    async for update in manager.run(user_query):
+    async for update in manager.run(user_query, deadline=deadline):
         if isinstance(update, str):
             st.session_state.status_log.append(update)
             status_placeholder.info("\n".join(st.session_state.status_log))
+        elif isinstance(update, RunMetadata):
+            st.session_state.run_metadata = update
         elif isinstance(update, ReportData):
             return update
 
@@ -59,16 +64,23 @@ async def run_research(user_query: str):
 # UI: Research Input
 # -----------------------------
 query = st.text_input("What topic would you like to research?")
+time_limit = st.number_input(
+    "Time limit in seconds (0 = no limit)",
+    min_value=0,
+    value=0,
+    step=30
+)
 start_btn = st.button("Start Research", type="primary")
 
 if start_btn and query:
     st.session_state.last_query = query
     st.session_state.report_content = None
     st.session_state.status_log = []
+    st.session_state.run_metadata = None
 
     with st.spinner("Initializing agents..."):
         try:
-            final_report = run_async(run_research(query))
+            final_report = run_async(run_research(query, deadline=time_limit or None))
             st.session_state.report_content = final_report
         except Exception as e:
             st.error(f"An error occurred: {e}")
@@ -82,6 +94,13 @@ if st.session_state.report_content:
 
     st.success("Research Complete!")
 
+    meta = st.session_state.run_metadata
+    if meta and meta.degraded:
+        st.warning(
+            "Parts of this research run were cut:\n"
+            + "\n".join(f"- {cut}" for cut in meta.cuts)
+        )
+
     # -----------------------------
     # Email Section
     # -----------------------------
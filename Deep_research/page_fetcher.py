@@ -0,0 +1,357 @@
+import asyncio
+import atexit
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import httpx
+from pydantic import BaseModel, Field
+
+MAX_CONNECTIONS = 10
+MAX_CONNECTIONS_PER_HOST = 2
+MAX_PAGE_BYTES = 1_000_000
+FETCH_TIMEOUT_SECONDS = 10.0
+EXTRACT_WORKERS = 2
+MAX_CACHED_PAGES = 256
+
+ALLOWED_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+# -----------------------------
+# Text Extraction
+# -----------------------------
+
+# Elements whose content is never part of the main article text
+SKIPPED_TAGS = {
+    "script", "style", "noscript", "template", "svg", "iframe",
+    "nav", "header", "footer", "aside", "form", "button", "select",
+}
+
+# Elements that start a new line of text
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "br", "li", "ul", "ol",
+    "h1", "h2", "h3", "h4", "h5", "h6", "tr", "table", "blockquote", "pre",
+}
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "source", "track", "wbr",
+}
+
+MIN_LINE_WORDS = 5
+
+
+class _MainTextParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title_parts: List[str] = []
+        self.lines: List[str] = []
+        self._current: List[str] = []
+        self._skip_depth = 0
+        self._in_title = False
+
+    def _flush(self):
+        line = " ".join("".join(self._current).split())
+        if line:
+            self.lines.append(line)
+        self._current = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            if tag == "br":
+                self._flush()
+            return
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title_parts.append(data)
+        elif not self._skip_depth:
+            self._current.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def extract_main_text(html: str) -> Tuple[str, str]:
+    """
+    Extracts the page title and main body text from an HTML document.
+    Boilerplate elements and short lines (menus, buttons, captions) are dropped.
+
+    Kept at module level so it can be dispatched to a process pool.
+    """
+    parser = _MainTextParser()
+    parser.feed(html)
+    parser.close()
+
+    title = " ".join("".join(parser.title_parts).split())
+    lines = [
+        line for line in parser.lines
+        if len(line.split()) >= MIN_LINE_WORDS
+    ]
+    return title, "\n".join(lines)
+
+
+def _extract_plain_text(text: str) -> Tuple[str, str]:
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    return "", "\n".join(line for line in lines if line)
+
+
+def _warm_up():
+    """No-op submitted to start the pool's workers ahead of the first page."""
+
+
+def _pool_context():
+    # The host process is multi-threaded (Streamlit, worker threads), so
+    # forking it could copy held locks into the children. forkserver is
+    # not available on Windows.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+# -----------------------------
+# Page Fetching
+# -----------------------------
+
+class FetchedPage(BaseModel):
+    url: str = Field(description="The URL the page was requested from.")
+    title: str = Field(default="", description="The page title, if any.")
+    text: str = Field(description="The extracted main text of the page.")
+    etag: Optional[str] = Field(default=None, description="The ETag returned by the server.")
+    truncated: bool = Field(default=False, description="Whether the body hit the byte cap.")
+
+
+class _Download(NamedTuple):
+    url: str
+    raw: str
+    content_type: str
+    etag: Optional[str]
+    truncated: bool
+
+
+class PageFetcher:
+    """
+    Fetches search result pages concurrently and extracts their main text.
+
+    Network I/O runs over a single pooled httpx client per batch, with a cap on
+    concurrent connections per host. Text extraction is CPU-bound and runs in a
+    process pool so the event loop stays responsive. Extracted pages are cached
+    by URL (least recently used pages are evicted) and revalidated with the
+    server's ETag on later fetches.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = MAX_CONNECTIONS,
+        max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+        max_bytes: int = MAX_PAGE_BYTES,
+        timeout: float = FETCH_TIMEOUT_SECONDS,
+        extract_workers: int = EXTRACT_WORKERS,
+        max_cached_pages: int = MAX_CACHED_PAGES,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.extract_workers = extract_workers
+        self.max_cached_pages = max_cached_pages
+        self.transport = transport
+
+        self._cache: "OrderedDict[str, FetchedPage]" = OrderedDict()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.extract_workers,
+                mp_context=_pool_context(),
+            )
+            self._executor.submit(_warm_up)
+            atexit.register(self.close)
+        return self._executor
+
+    def _cache_get(self, url: str) -> Optional[FetchedPage]:
+        page = self._cache.get(url)
+        if page is not None:
+            self._cache.move_to_end(url)
+        return page
+
+    def _cache_put(self, page: FetchedPage):
+        self._cache[page.url] = page
+        self._cache.move_to_end(page.url)
+        while len(self._cache) > self.max_cached_pages:
+            self._cache.popitem(last=False)
+
+    def close(self):
+        """Shuts down the extraction process pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            atexit.unregister(self.close)
+
+    async def fetch_all(self, urls: List[str], timeout: Optional[float] = None) -> List[FetchedPage]:
+        """
+        Fetches and extracts every URL concurrently.
+        Failed, non-text or empty pages are left out; order follows `urls`.
+
+        `timeout` bounds the whole batch: pages still queued or downloading
+        when it runs out are dropped and the rest are returned.
+        """
+        unique_urls = [
+            u for u in dict.fromkeys(urls)
+            if urlparse(u).scheme in ("http", "https")
+        ]
+        if not unique_urls:
+            return []
+
+        # Workers start while the pages download rather than inside the
+        # first page's fetch timeout
+        self._get_executor()
+
+        # The client and semaphores are bound to the running event loop,
+        # so they are created per batch. The cache and pool outlive it.
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        loop = asyncio.get_running_loop()
+        expires_at = loop.time() + timeout if timeout is not None else None
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+        )
+
+        async with httpx.AsyncClient(
+            limits=limits,
+            timeout=httpx.Timeout(self.timeout),
+            follow_redirects=True,
+            headers={"User-Agent": "Mozilla/5.0 (compatible; DeepResearchBot/0.1)"},
+            transport=self.transport,
+        ) as client:
+            tasks = []
+            for url in unique_urls:
+                host = urlparse(url).netloc
+                if host not in host_limits:
+                    host_limits[host] = asyncio.Semaphore(self.max_connections_per_host)
+                tasks.append(self._fetch_one(client, host_limits[host], url, expires_at))
+
+            pages = await asyncio.gather(*tasks)
+
+        return [p for p in pages if p is not None and p.text]
+
+    async def _fetch_one(
+        self,
+        client: httpx.AsyncClient,
+        host_limit: asyncio.Semaphore,
+        url: str,
+        expires_at: Optional[float] = None,
+    ) -> Optional[FetchedPage]:
+        loop = asyncio.get_running_loop()
+        try:
+            # The host slot and the page timeout cover the download only
+            async with host_limit:
+                timeout = self.timeout
+                if expires_at is not None:
+                    timeout = min(timeout, expires_at - loop.time())
+                    if timeout <= 0:
+                        return None
+
+                # Bounds the whole download, not just each socket read
+                download = await asyncio.wait_for(
+                    self._download(client, url),
+                    timeout=timeout,
+                )
+
+            if download is None or isinstance(download, FetchedPage):
+                return download
+
+            # Extraction is only bounded by the batch deadline
+            extract_timeout = None
+            if expires_at is not None:
+                extract_timeout = max(0.0, expires_at - loop.time())
+
+            return await asyncio.wait_for(
+                self._extract(download),
+                timeout=extract_timeout,
+            )
+        except Exception as e:
+            print(f"DEBUG: Fetch failed for {url}: {e!r}")
+            return None
+
+    async def _download(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+    ) -> Union[FetchedPage, _Download, None]:
+        """Downloads a page, returning the cached page if it is unchanged."""
+        cached = self._cache_get(url)
+        headers = {}
+        if cached is not None and cached.etag:
+            headers["If-None-Match"] = cached.etag
+
+        async with client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and cached is not None:
+                return cached
+
+            response.raise_for_status()
+
+            content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+            if content_type and content_type not in ALLOWED_CONTENT_TYPES:
+                print(f"DEBUG: Skipping {url} (content-type {content_type})")
+                return None
+
+            etag = response.headers.get("etag")
+            if cached is not None and etag and cached.etag == etag:
+                return cached
+
+            body = bytearray()
+            truncated = False
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) >= self.max_bytes:
+                    del body[self.max_bytes:]
+                    truncated = True
+                    break
+
+            encoding = response.encoding or "utf-8"
+
+        return _Download(
+            url=url,
+            raw=bytes(body).decode(encoding, errors="replace"),
+            content_type=content_type,
+            etag=etag,
+            truncated=truncated,
+        )
+
+    async def _extract(self, download: _Download) -> FetchedPage:
+        extract = _extract_plain_text if download.content_type == "text/plain" else extract_main_text
+
+        loop = asyncio.get_running_loop()
+        title, text = await loop.run_in_executor(self._get_executor(), extract, download.raw)
+
+        page = FetchedPage(
+            url=download.url,
+            title=title,
+            text=text,
+            etag=download.etag,
+            truncated=download.truncated,
+        )
+
+        if download.etag:
+            self._cache_put(page)
+
+        return page
@@ -1,80 +1,385 @@
 import asyncio
-from typing import AsyncGenerator, Union
+import math
+from typing import AsyncGenerator, List, Optional, Union
+from pydantic import BaseModel, Field
 from agents import Runner
-from planner_agent import planner_agent
-from search_agent import search_agent
+from budget import RunBudget, DeadlineExceeded, BudgetExceeded
+from planner_agent import planner_agent, WebSearchPlan, WebSearchItem
+from search_agent import search_agent, SEARCH_TIMEOUT_SECONDS
 from writer_agent import writer_agent, ReportData
 from email_agent import email_agent
+from page_fetcher import PageFetcher
+
+MAX_PAGES_TO_FETCH = 9
+MAX_PASSAGE_CHARS = 3000
+
+# Deadline handling (seconds unless noted)
+PLANNER_SHARE = 0.2                  # fraction of the remaining time the planner may use
+WRITER_SHARE = 0.4                   # fraction of the deadline held back for the writer
+WRITER_RESERVE_SECONDS = 30.0
+FULL_WRITER_PROMPT_SECONDS = 20.0    # below this the writer gets a shortened prompt
+SHORT_CONTEXT_CHARS = 4000
+LOW_TIME_SEARCH_WINDOW_SECONDS = 15.0
+MIN_FETCH_WINDOW_SECONDS = 5.0
+SAFETY_MARGIN_SECONDS = 1.0
+CALLS_PER_SEARCH = 1                 # the search agent stops after its tool call
+MAX_SEARCH_SECONDS = 20.0            # cap for any one search, deadline or not
+STRAGGLER_QUORUM = 2 / 3             # share of searches to wait for before cutting stragglers
+STRAGGLER_GRACE_SECONDS = 3.0        # extra wait for stragglers once the quorum is in
+
+
+class RunMetadata(BaseModel):
+    """Describes how a research run went and what was cut to meet its limits."""
+    elapsed_seconds: float = 0.0
+    model_calls: int = 0
+    planner_fallback: bool = False
+    searches_planned: int = 0
+    searches_completed: int = 0
+    skipped_searches: list[str] = Field(default_factory=list)
+    pages_fetched: int = 0
+    writer_prompt_shortened: bool = False
+    snippet_only: bool = False
+    cuts: list[str] = Field(default_factory=list)
+
+    @property
+    def degraded(self) -> bool:
+        return bool(self.cuts)
+
+
+def _calls_available(budget: RunBudget, reserve: int) -> Optional[int]:
+    """Model calls a phase may use while keeping `reserve` for later phases."""
+    left = budget.calls_left()
+    if left is None:
+        return None
+    return max(0, left - reserve)
+
+
+def _window(budget: RunBudget, reserve: float) -> Optional[float]:
+    """Seconds a phase may use while keeping `reserve` for later phases."""
+    remaining = budget.remaining()
+    if remaining is None:
+        return None
+    return remaining - reserve
+
+
+def _degradation_reason(budget: RunBudget, error: Exception) -> str:
+    """
+    Describes why a phase was cut short. A run without limits must not hide
+    failures behind a degraded report, so its errors are re-raised.
+    """
+    if isinstance(error, DeadlineExceeded):
+        return "time limit reached"
+    if isinstance(error, BudgetExceeded):
+        return "model-call budget exhausted"
+    if not budget.limited():
+        raise error
+    return f"{type(error).__name__}: {error}"
 
 
 class ResearchManager:
     def __init__(self):
         self.runner = Runner()
+        self.fetcher = PageFetcher()
 
-    async def run(self, query: str) -> AsyncGenerator[Union[str, ReportData], None]:
+    async def run(
+        self,
+        query: str,
+        deadline: Optional[float] = None,
+        max_model_calls: Optional[int] = None
+    ) -> AsyncGenerator[Union[str, RunMetadata, ReportData], None]:
         """
         Orchestrates the research process:
         1. Plan searches
         2. Execute searches
-        3. Write final report
+        3. Fetch and extract the result pages
+        4. Write final report
+
+        `deadline` is the number of seconds the run may take and
+        `max_model_calls` the maximum number of model calls. As either runs short the run degrades:
+        fewer searches, skipped stragglers, no page reading, a shorter writer
+        prompt and, as a last resort, a snippet-only summary. A ReportData is
+        always yielded, preceded by a RunMetadata describing what was cut.
         """
+        run_budget = RunBudget(seconds=deadline, max_model_calls=max_model_calls)
+        meta = RunMetadata()
+
+        writer_reserve = WRITER_RESERVE_SECONDS
+        if deadline is not None:
+            writer_reserve = min(WRITER_RESERVE_SECONDS, deadline * WRITER_SHARE)
 
         # 1. Planning phase
         yield "Creating research plan..."
-        plan_result = await self.runner.run(
-            agent=planner_agent,
-            messages=[{
-                "role": "user",
-                "content": f"Create a research plan for: {query}"
-            }]
-        )
-
-        plan = plan_result.output  # WebSearchPlan
+        plan = await self._plan(query, run_budget, meta)
 
         # 2. Research/Search phase
+        searches = plan.searches
+        meta.searches_planned = len(searches)
+
+        search_window = _window(run_budget, writer_reserve)
+        search_calls = _calls_available(run_budget, reserve=1)
+
+        # Fewer searches when time or model calls are short
+        max_searches = len(searches)
+        if search_calls is not None:
+            max_searches = min(max_searches, search_calls // CALLS_PER_SEARCH)
+        if search_window is not None:
+            if search_window <= 0:
+                max_searches = 0
+            elif search_window < LOW_TIME_SEARCH_WINDOW_SECONDS:
+                max_searches = min(max_searches, 1)
+
+        if max_searches < len(searches):
+            dropped = searches[max_searches:]
+            searches = searches[:max_searches]
+            meta.skipped_searches.extend(item.query for item in dropped)
+            meta.cuts.append(f"Dropped {len(dropped)} of {meta.searches_planned} planned searches")
+
+        for i, item in enumerate(searches):
+            yield f"Searching ({i + 1}/{len(searches)}): {item.query}..."
+
+        search_budget = run_budget.slice(seconds=search_window, max_model_calls=search_calls)
+        search_payloads = await self._search_all(searches, search_budget, meta)
+
         all_results = []
+        source_urls = []
+
+        # Normalize structured search output into readable context
+        for search_data in search_payloads:
+            formatted = [
+                f"- {r['title']}\n  {r['snippet']}\n  Source: {r['url']}"
+                for r in search_data["results"]
+            ]
+            block = f"Search query: {search_data.get('query')}\n" + "\n".join(formatted)
+            all_results.append(block)
+            source_urls.extend(r["url"] for r in search_data["results"] if r["url"])
+
+        # 3. Page retrieval phase
+        page_results = []
+        source_urls = list(dict.fromkeys(source_urls))[:MAX_PAGES_TO_FETCH]
+        fetch_window = _window(run_budget, writer_reserve)
+
+        if source_urls and fetch_window is not None and fetch_window < MIN_FETCH_WINDOW_SECONDS:
+            meta.cuts.append("Skipped reading source pages")
+        elif source_urls:
+            yield f"Reading {len(source_urls)} source pages..."
+
+            # fetch_all bounds itself and keeps pages that finished in time
+            pages = await self.fetcher.fetch_all(source_urls, timeout=fetch_window)
+
+            meta.pages_fetched = len(pages)
+            if len(pages) < len(source_urls) and fetch_window is not None:
+                meta.cuts.append(f"Read {len(pages)} of {len(source_urls)} source pages")
+            for page in pages:
+                passage = page.text[:MAX_PASSAGE_CHARS]
+                page_results.append(
+                    f"Source page: {page.title or page.url}\n"
+                    f"URL: {page.url}\n"
+                    f"{passage}"
+                )
+
+        research_context = "\n\n".join(all_results + page_results)
+
+        # 4. Writing phase
+        writer_window = _window(run_budget, SAFETY_MARGIN_SECONDS)
+        writer_calls = _calls_available(run_budget, reserve=0)
+        instructions = ""
+
+        if writer_window is not None and writer_window < FULL_WRITER_PROMPT_SECONDS:
+            # Snippets only, capped, and ask for a brief report
+            research_context = "\n\n".join(all_results)[:SHORT_CONTEXT_CHARS]
+            instructions = "Time is limited: keep the report brief.\n\n"
+            meta.writer_prompt_shortened = True
+            meta.cuts.append("Shortened the writer prompt")
 
-        for i, item in enumerate(plan.searches):
-            yield f"Searching ({i + 1}/{len(plan.searches)}): {item.query}..."
+        report = None
+        if writer_window is not None and writer_window <= 0:
+            reason = "time limit reached"
+        elif writer_calls == 0:
+            reason = "model-call budget exhausted"
+        else:
+            yield "Writing final report..."
+            try:
+                report_result = await self.runner.run(
+                    agent=writer_agent,
+                    messages=[{
+                        "role": "user",
+                        "content": (
+                            f"{instructions}"
+                            f"Original research query:\n{query}\n\n"
+                            f"Collected research findings:\n{research_context}"
+                        )
+                    }],
+                    budget=run_budget.slice(seconds=writer_window)
+                )
+                report = report_result.output
+                reason = "the writer returned no report"
+            except Exception as e:
+                print(f"ERROR: Writer failed: {e}")
+                reason = _degradation_reason(run_budget, e)
+
+        if not isinstance(report, ReportData):
+            if not run_budget.limited():
+                raise RuntimeError(f"Writer failed: {reason}")
+
+            report = self._snippet_report(query, search_payloads, reason)
+            meta.snippet_only = True
+            meta.cuts.append(f"Fell back to a snippet-only summary ({reason})")
+
+        meta.elapsed_seconds = round(run_budget.elapsed(), 2)
+        meta.model_calls = run_budget.model_calls
+
+        yield "Finalizing report display..."
+        yield meta
+        yield report
+
+    async def _plan(self, query: str, run_budget: RunBudget, meta: RunMetadata) -> WebSearchPlan:
+        """Runs the planner, falling back to searching the query itself."""
+        remaining = run_budget.remaining()
+        planner_seconds = remaining * PLANNER_SHARE if remaining is not None else None
+        planner_calls = _calls_available(run_budget, reserve=1 + CALLS_PER_SEARCH)
+
+        plan = None
+        reason = "model-call budget exhausted"
+        if planner_calls != 0:
+            try:
+                plan_result = await self.runner.run(
+                    agent=planner_agent,
+                    messages=[{
+                        "role": "user",
+                        "content": f"Create a research plan for: {query}"
+                    }],
+                    budget=run_budget.slice(seconds=planner_seconds, max_model_calls=planner_calls)
+                )
+                plan = plan_result.output  # WebSearchPlan
+                reason = "the planner returned no searches"
+            except Exception as e:
+                print(f"ERROR: Planner failed: {e}")
+                reason = _degradation_reason(run_budget, e)
+
+        if not isinstance(plan, WebSearchPlan) or not plan.searches:
+            if not run_budget.limited():
+                raise RuntimeError(f"Planner failed: {reason}")
+
+            meta.planner_fallback = True
+            meta.cuts.append(f"Planner skipped ({reason}); searched the query directly")
+            plan = WebSearchPlan(searches=[
+                WebSearchItem(reason="Fallback: search the original query.", query=query)
+            ])
+
+        return plan
+
+    async def _search_all(
+        self,
+        searches: List[WebSearchItem],
+        search_budget: RunBudget,
+        meta: RunMetadata
+    ) -> List[dict]:
+        """
+        Runs the search agent for each search concurrently. Only the raw
+        results search_web records are used, so each run stops after its tool
+        call instead of summarizing them.
+
+        Once STRAGGLER_QUORUM of the searches have returned, the rest get
+        STRAGGLER_GRACE_SECONDS before they are cancelled, and no search runs
+        past MAX_SEARCH_SECONDS or the search budget. Searches that fail or
+        are cut off are skipped.
+        """
+        if not searches:
+            return []
 
-            search_result = await self.runner.run(
+        search_budget = search_budget.slice(seconds=MAX_SEARCH_SECONDS)
+
+        timeout = SEARCH_TIMEOUT_SECONDS
+        remaining = search_budget.remaining()
+        if remaining is not None:
+            # Lets the search threads end close to the deadline
+            timeout = max(1, min(timeout, math.floor(remaining)))
+
+        # search_web records its raw results here
+        contexts = [{"search_timeout": timeout} for _ in searches]
+        tasks = [
+            asyncio.create_task(self.runner.run(
                 agent=search_agent,
                 messages=[{
                     "role": "user",
                     "content": item.query
-                }]
+                }],
+                context_variables=context,
+                budget=search_budget,
+                stop_after_tools=True
+            ))
+            for item, context in zip(searches, contexts)
+        ]
+
+        # Wait for the quorum, then give the stragglers a short grace period
+        quorum = math.ceil(len(tasks) * STRAGGLER_QUORUM)
+        pending = set(tasks)
+        while pending and len(tasks) - len(pending) < quorum:
+            _, pending = await asyncio.wait(
+                pending,
+                timeout=search_budget.remaining(),
+                return_when=asyncio.FIRST_COMPLETED
             )
+            if search_budget.expired():
+                break
 
-            search_data = search_result.output
+        if pending and not search_budget.expired():
+            grace = min(STRAGGLER_GRACE_SECONDS, search_budget.remaining())
+            _, pending = await asyncio.wait(pending, timeout=grace)
 
-            # Normalize structured search output into readable context
-            if isinstance(search_data, dict) and "results" in search_data:
-                formatted = [
-                    f"- {r['title']}\n  {r['snippet']}\n  Source: {r['url']}"
-                    for r in search_data["results"]
-                ]
-                block = f"Search query: {search_data.get('query')}\n" + "\n".join(formatted)
-                all_results.append(block)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
-        research_context = "\n\n".join(all_results)
+        payloads = []
+        for item, context in zip(searches, contexts):
+            collected = [
+                data for data in context.get("search_results", [])
+                if "results" in data
+            ]
 
-        # 3. Writing phase
-        yield "Writing final report..."
-        report_result = await self.runner.run(
-            agent=writer_agent,
-            messages=[{
-                "role": "user",
-                "content": (
-                    f"Original research query:\n{query}\n\n"
-                    f"Collected research findings:\n{research_context}"
-                )
-            }]
-        )
+            if collected:
+                meta.searches_completed += 1
+                payloads.extend(collected)
+            else:
+                meta.skipped_searches.append(item.query)
 
-        report: ReportData = report_result.output
+        skipped = len(searches) - meta.searches_completed
+        if skipped:
+            meta.cuts.append(f"Skipped {skipped} searches that failed or ran out of time")
 
-        yield "Finalizing report display..."
-        yield report
+        return payloads
+
+    def _snippet_report(
+        self,
+        query: str,
+        search_payloads: List[dict],
+        reason: str
+    ) -> ReportData:
+        """Builds a report from raw search snippets when the writer cannot run."""
+        sections = []
+        for search_data in search_payloads:
+            lines = [
+                f"- [{r['title'] or r['url']}]({r['url']}): {r['snippet']}"
+                for r in search_data["results"]
+            ]
+            sections.append(f"### {search_data.get('query')}\n" + "\n".join(lines))
+
+        if not sections:
+            sections.append("_No search results were collected._")
+
+        return ReportData(
+            short_summary=(
+                f"A full report could not be written ({reason}). "
+                "Raw search snippets are listed below."
+            ),
+            markdown_report=f"## {query}\n\n" + "\n\n".join(sections),
+            follow_up_questions=[],
+        )
+
+    def close(self):
+        """Releases the page fetcher's worker processes."""
+        self.fetcher.close()
 
     async def send_report_email(self, report: ReportData, email: str, query: str):
         """
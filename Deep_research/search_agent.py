@@ -1,17 +1,32 @@
+from typing import Any, Dict, Optional
 from agents import Agent, function_tool
 from duckduckgo_search import DDGS
 
 from agents import function_tool
 from duckduckgo_search import DDGS
 
+SEARCH_TIMEOUT_SECONDS = 10
+
 @function_tool
-def search_web(query: str) -> dict:
+def search_web(query: str, context_variables: Optional[Dict[str, Any]] = None) -> dict:
     """
     Searches the web using DuckDuckGo and returns the top results
     in a structured format suitable for agent reasoning.
     """
+    context_variables = context_variables if context_variables is not None else {}
+
+    # Callers with a deadline pass a shorter per-request timeout
+    payload = _search(query, context_variables.get("search_timeout", SEARCH_TIMEOUT_SECONDS))
+
+    # Expose the raw results to the caller (e.g. for page fetching)
+    context_variables.setdefault("search_results", []).append(payload)
+
+    return payload
+
+
+def _search(query: str, timeout: int) -> dict:
     try:
-        with DDGS() as ddgs:
+        with DDGS(timeout=timeout) as ddgs:
             results = list(ddgs.text(query, max_results=3))
     except Exception as e:
         return {
@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# agents.py builds its API clients at import time
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+
+
+class FixtureServer:
+    """
+    Local HTTP server for fetcher tests.
+
+    `routes` maps a path to a dict with `body` (bytes) and optionally
+    `content_type`, `etag` and `delay` (seconds before the body is sent).
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def _handler(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with fixture._lock:
+                    fixture.requests.append((self.path, self.headers.get("If-None-Match")))
+                    fixture.in_flight += 1
+                    fixture.max_in_flight = max(fixture.max_in_flight, fixture.in_flight)
+                try:
+                    self._respond()
+                finally:
+                    with fixture._lock:
+                        fixture.in_flight -= 1
+
+            def _respond(self):
+                route = fixture.routes.get(self.path)
+                if route is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+
+                time.sleep(route.get("delay", 0))
+
+                etag = route.get("etag")
+                if etag and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", route.get("content_type", "text/html; charset=utf-8"))
+                self.send_header("Content-Length", str(len(route["body"])))
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                try:
+                    self.wfile.write(route["body"])
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def fixture_server():
+    server = FixtureServer()
+    server.start()
+    yield server
+    server.stop()
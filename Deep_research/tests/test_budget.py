@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from budget import BudgetExceeded, DeadlineExceeded, RunBudget
+
+
+def test_unlimited_budget():
+    budget = RunBudget()
+
+    budget.charge_model_call()
+
+    assert budget.remaining() is None
+    assert budget.calls_left() is None
+    assert not budget.expired()
+    assert budget.model_calls == 1
+
+
+def test_charge_counts_against_ancestors():
+    parent = RunBudget(max_model_calls=3)
+    child = parent.slice(max_model_calls=2)
+
+    child.charge_model_call()
+
+    assert child.model_calls == 1
+    assert parent.model_calls == 1
+    assert child.calls_left() == 1
+    assert parent.calls_left() == 2
+
+
+def test_child_calls_capped_by_parent():
+    parent = RunBudget(max_model_calls=1)
+    child = parent.slice(max_model_calls=5)
+
+    child.charge_model_call()
+
+    assert child.calls_left() == 0
+    with pytest.raises(BudgetExceeded):
+        child.charge_model_call()
+
+
+def test_zero_call_budget():
+    with pytest.raises(BudgetExceeded):
+        RunBudget(max_model_calls=0).charge_model_call()
+
+
+def test_slice_never_outlives_parent():
+    parent = RunBudget(seconds=1.0)
+
+    assert parent.slice(seconds=60.0).remaining() <= 1.0
+    assert parent.slice().remaining() <= 1.0
+    assert parent.slice(seconds=0.1).remaining() <= 0.1
+
+
+def test_negative_slice_is_expired():
+    budget = RunBudget(seconds=10.0).slice(seconds=-5.0)
+
+    assert budget.expired()
+    assert budget.remaining() == 0
+
+
+def test_expired_deadline_rejects_calls():
+    budget = RunBudget(seconds=0.05)
+    time.sleep(0.1)
+
+    with pytest.raises(DeadlineExceeded):
+        budget.charge_model_call()
+    assert budget.model_calls == 0
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from page_fetcher import PageFetcher, extract_main_text
+
+ARTICLE = (
+    b"<html><head><title>Fixture page</title><script>track()</script></head>"
+    b"<body><nav>Home About Contact Blog Careers</nav>"
+    b"<article><p>The main article text lives in this paragraph.</p></article>"
+    b"<footer>Copyright notice and some footer links here</footer></body></html>"
+)
+
+
+@pytest.fixture
+def fetcher():
+    fetcher = PageFetcher(max_bytes=1000, timeout=5.0)
+    yield fetcher
+    fetcher.close()
+
+
+def test_extract_main_text_drops_boilerplate():
+    title, text = extract_main_text(ARTICLE.decode())
+
+    assert title == "Fixture page"
+    assert text == "The main article text lives in this paragraph."
+
+
+def test_fetch_all_extracts_pages(fixture_server, fetcher):
+    fixture_server.routes["/a"] = {"body": ARTICLE}
+
+    pages = asyncio.run(fetcher.fetch_all([fixture_server.url("/a")]))
+
+    assert len(pages) == 1
+    assert pages[0].title == "Fixture page"
+    assert "track()" not in pages[0].text
+    assert "Home About" not in pages[0].text
+
+
+def test_revalidation_returns_cached_page(fixture_server, fetcher):
+    fixture_server.routes["/a"] = {"body": ARTICLE, "etag": '"v1"'}
+    url = fixture_server.url("/a")
+
+    first = asyncio.run(fetcher.fetch_all([url]))
+    second = asyncio.run(fetcher.fetch_all([url]))
+
+    assert fixture_server.requests == [("/a", None), ("/a", '"v1"')]
+    assert second == first
+    assert second[0].etag == '"v1"'
+
+
+def test_byte_cap_truncates_body(fixture_server, fetcher):
+    fixture_server.routes["/big"] = {
+        "body": b"word " * 10_000,
+        "content_type": "text/plain",
+    }
+
+    pages = asyncio.run(fetcher.fetch_all([fixture_server.url("/big")]))
+
+    assert pages[0].truncated
+    assert len(pages[0].text) <= 1000
+
+
+def test_non_text_content_is_skipped(fixture_server, fetcher):
+    fixture_server.routes["/doc.pdf"] = {"body": b"%PDF-1.7", "content_type": "application/pdf"}
+    fixture_server.routes["/a"] = {"body": ARTICLE}
+
+    pages = asyncio.run(fetcher.fetch_all([
+        fixture_server.url("/doc.pdf"),
+        fixture_server.url("/a"),
+    ]))
+
+    assert [p.url for p in pages] == [fixture_server.url("/a")]
+
+
+def test_per_host_limit(fixture_server):
+    fetcher = PageFetcher(max_connections_per_host=2, timeout=5.0)
+    urls = []
+    for i in range(6):
+        fixture_server.routes[f"/slow{i}"] = {"body": ARTICLE, "delay": 0.2}
+        urls.append(fixture_server.url(f"/slow{i}"))
+
+    try:
+        pages = asyncio.run(fetcher.fetch_all(urls))
+    finally:
+        fetcher.close()
+
+    assert len(pages) == 6
+    assert fixture_server.max_in_flight == 2
+
+
+def test_batch_timeout_keeps_finished_pages(fixture_server, fetcher):
+    fixture_server.routes["/fast"] = {"body": ARTICLE}
+    fixture_server.routes["/slow"] = {"body": ARTICLE, "delay": 3}
+
+    pages = asyncio.run(fetcher.fetch_all(
+        [fixture_server.url("/fast"), fixture_server.url("/slow")],
+        timeout=1.0,
+    ))
+
+    assert [p.url for p in pages] == [fixture_server.url("/fast")]
+
+
+def test_cache_evicts_least_recently_used(fixture_server):
+    fetcher = PageFetcher(max_cached_pages=2)
+    for path in ("/a", "/b", "/c"):
+        fixture_server.routes[path] = {"body": ARTICLE, "etag": f'"{path}"'}
+
+    try:
+        for path in ("/a", "/b", "/a", "/c"):
+            asyncio.run(fetcher.fetch_all([fixture_server.url(path)]))
+    finally:
+        fetcher.close()
+
+    assert list(fetcher._cache) == [fixture_server.url("/a"), fixture_server.url("/c")]
@@ -0,0 +1,310 @@
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import agents
+import research_manager
+import search_agent
+from budget import DeadlineExceeded, RunBudget
+from planner_agent import INSTRUCTIONS as PLANNER_INSTRUCTIONS, WebSearchItem, WebSearchPlan
+from research_manager import ResearchManager, RunMetadata
+from search_agent import INSTRUCTIONS as SEARCH_INSTRUCTIONS
+from writer_agent import ReportData
+
+PLAN = WebSearchPlan(searches=[
+    WebSearchItem(reason="r", query=f"q{i}") for i in range(3)
+])
+REPORT = ReportData(short_summary="written", markdown_report="## Report", follow_up_questions=[])
+
+
+class FakeClient:
+    """
+    Stands in for the OpenAI clients. The planner and writer respond with the
+    structured outputs above and the search agent calls search_web with its
+    query. Agents block when named in `hang` or raise when named in `fail`.
+    """
+
+    def __init__(self, release: threading.Event):
+        self.release = release
+        self.hang = set()
+        self.fail = set()
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._complete))
+        self.beta = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(parse=self._complete)))
+
+    def with_options(self, **kwargs):
+        return self
+
+    def _complete(self, model, messages, **kwargs):
+        agent = {
+            PLANNER_INSTRUCTIONS: "planner",
+            SEARCH_INSTRUCTIONS: "search",
+        }.get(messages[0]["content"], "writer")
+        self.calls.append((agent, list(messages)))
+        if agent in self.hang:
+            self.release.wait(30)
+            raise RuntimeError("released")
+        if agent in self.fail:
+            raise RuntimeError("401 invalid api key")
+
+        if agent == "search":
+            tool_call = SimpleNamespace(id="call-1", function=SimpleNamespace(
+                name="search_web",
+                arguments=json.dumps({"query": messages[-1]["content"]})
+            ))
+            message = SimpleNamespace(content=None, tool_calls=[tool_call])
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+        parsed = PLAN if agent == "planner" else REPORT
+        message = SimpleNamespace(content=parsed.model_dump_json(), tool_calls=None, parsed=parsed)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeDDGS:
+    """Stands in for DuckDuckGo; queries named in `hang` block until released."""
+
+    release: threading.Event
+    hang = set()
+    urls = {}
+    timeouts = []
+
+    def __init__(self, timeout=None):
+        FakeDDGS.timeouts.append(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def text(self, query, max_results):
+        if query in FakeDDGS.hang:
+            FakeDDGS.release.wait(30)
+            raise RuntimeError("released")
+        return [{"title": f"t-{query}", "href": FakeDDGS.urls.get(query, ""), "body": f"snippet-{query}"}]
+
+
+@pytest.fixture
+def release():
+    # Unblocks hung fakes so worker threads finish before the test ends
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+@pytest.fixture
+def client(monkeypatch, release):
+    fake = FakeClient(release)
+    monkeypatch.setattr(agents, "gemini_client", fake)
+    monkeypatch.setattr(agents, "openrouter_client", fake)
+    return fake
+
+
+@pytest.fixture
+def ddgs(monkeypatch, release):
+    monkeypatch.setattr(FakeDDGS, "release", release, raising=False)
+    monkeypatch.setattr(FakeDDGS, "hang", set())
+    monkeypatch.setattr(FakeDDGS, "urls", {})
+    monkeypatch.setattr(FakeDDGS, "timeouts", [])
+    monkeypatch.setattr(search_agent, "DDGS", FakeDDGS)
+    return FakeDDGS
+
+
+@pytest.fixture
+def manager():
+    manager = ResearchManager()
+    yield manager
+    manager.close()
+
+
+async def _collect(manager, query="topic", **kwargs):
+    updates = [u async for u in manager.run(query, **kwargs)]
+    meta = next(u for u in updates if isinstance(u, RunMetadata))
+    assert isinstance(updates[-1], ReportData)
+    return meta, updates[-1]
+
+
+def test_unlimited_run(client, ddgs, manager):
+    meta, report = asyncio.run(_collect(manager))
+
+    assert report == REPORT
+    assert meta.cuts == []
+    assert not meta.degraded
+    assert meta.searches_completed == 3
+    assert meta.model_calls == 5
+    writer_prompt = client.calls[-1][1][-1]["content"]
+    assert all(f"snippet-q{i}" in writer_prompt for i in range(3))
+
+
+def test_zero_budget_gives_snippet_report(client, ddgs, manager):
+    meta, report = asyncio.run(_collect(manager, max_model_calls=0))
+
+    assert client.calls == []
+    assert meta.model_calls == 0
+    assert meta.planner_fallback
+    assert meta.snippet_only
+    assert meta.searches_completed == 0
+    assert "model-call budget exhausted" in report.short_summary
+
+
+def test_budget_of_one_goes_to_the_writer(client, ddgs, manager):
+    meta, report = asyncio.run(_collect(manager, max_model_calls=1))
+
+    assert [agent for agent, _ in client.calls] == ["writer"]
+    assert meta.planner_fallback
+    assert meta.searches_completed == 0
+    assert report == REPORT
+
+
+def test_budget_of_two_searches_the_query(client, ddgs, manager):
+    meta, report = asyncio.run(_collect(manager, max_model_calls=2))
+
+    assert [agent for agent, _ in client.calls] == ["search", "writer"]
+    assert meta.planner_fallback
+    assert meta.searches_completed == 1
+    assert "snippet-topic" in client.calls[-1][1][-1]["content"]
+    assert report == REPORT
+
+
+def test_budget_of_three_drops_searches(client, ddgs, manager):
+    meta, report = asyncio.run(_collect(manager, max_model_calls=3))
+
+    assert [agent for agent, _ in client.calls] == ["planner", "search", "writer"]
+    assert meta.searches_completed == 1
+    assert meta.skipped_searches == ["q1", "q2"]
+    assert meta.cuts == ["Dropped 2 of 3 planned searches"]
+    assert report == REPORT
+
+
+def test_budget_of_five_runs_everything(client, ddgs, manager):
+    meta, report = asyncio.run(_collect(manager, max_model_calls=5))
+
+    assert meta.model_calls == 5
+    assert meta.searches_completed == 3
+    assert meta.skipped_searches == []
+    assert meta.cuts == []
+    assert report == REPORT
+
+
+def test_hung_planner_falls_back(client, ddgs, manager):
+    client.hang.add("planner")
+
+    start = time.monotonic()
+    meta, report = asyncio.run(_collect(manager, deadline=5))
+
+    assert time.monotonic() - start < 5
+    assert meta.planner_fallback
+    assert meta.writer_prompt_shortened
+    assert report == REPORT
+
+
+def test_hung_search_is_skipped(client, ddgs, manager, monkeypatch):
+    monkeypatch.setattr(research_manager, "LOW_TIME_SEARCH_WINDOW_SECONDS", 1.0)
+    ddgs.hang.add("q0")
+
+    start = time.monotonic()
+    meta, report = asyncio.run(_collect(manager, deadline=5))
+
+    assert time.monotonic() - start < 5
+    assert meta.searches_completed == 2
+    assert meta.skipped_searches == ["q0"]
+    assert all(timeout <= 3 for timeout in ddgs.timeouts)
+    assert report == REPORT
+
+
+def test_hung_search_does_not_starve_page_fetching(client, ddgs, manager, fixture_server, monkeypatch):
+    monkeypatch.setattr(research_manager, "STRAGGLER_GRACE_SECONDS", 0.5)
+    page = b"<html><body><p>A fetched source page with enough words.</p></body></html>"
+    fixture_server.routes["/a"] = {"body": page}
+    fixture_server.routes["/b"] = {"body": page}
+    ddgs.urls.update({"q1": fixture_server.url("/a"), "q2": fixture_server.url("/b")})
+    ddgs.hang.add("q0")
+
+    start = time.monotonic()
+    meta, report = asyncio.run(_collect(manager, deadline=120))
+
+    assert time.monotonic() - start < 10
+    assert meta.skipped_searches == ["q0"]
+    assert meta.pages_fetched == 2
+    assert not any("source pages" in cut for cut in meta.cuts)
+    assert report == REPORT
+
+
+def test_low_time_limits_searches(client, ddgs, manager):
+    meta, _ = asyncio.run(_collect(manager, deadline=5))
+
+    assert meta.searches_completed == 1
+    assert meta.skipped_searches == ["q1", "q2"]
+
+
+def test_hung_writer_gives_snippet_report(client, ddgs, manager):
+    client.hang.add("writer")
+
+    start = time.monotonic()
+    meta, report = asyncio.run(_collect(manager, deadline=5))
+
+    assert time.monotonic() - start < 5
+    assert meta.snippet_only
+    assert "snippet-q0" in report.markdown_report
+
+
+@pytest.mark.parametrize("agent", ["planner", "writer"])
+def test_errors_propagate_without_limits(client, ddgs, manager, agent):
+    client.fail.add(agent)
+
+    with pytest.raises(RuntimeError, match="401 invalid api key"):
+        asyncio.run(_collect(manager))
+
+
+def test_errors_are_reported_with_limits(client, ddgs, manager):
+    client.fail.add("writer")
+
+    meta, report = asyncio.run(_collect(manager, deadline=60))
+
+    assert meta.snippet_only
+    assert "401 invalid api key" in meta.cuts[-1]
+    assert "401 invalid api key" in report.short_summary
+    assert "time limit" not in report.short_summary
+
+
+def test_asyncio_run_returns_before_deadline(client, ddgs, manager):
+    # The Streamlit app drives the generator through asyncio.run()
+    ddgs.hang.update({"q0", "q1", "q2", "topic"})
+
+    start = time.monotonic()
+    asyncio.run(_collect(manager, deadline=3))
+
+    assert time.monotonic() - start < 3
+
+
+def test_partial_page_fetch(client, ddgs, manager, fixture_server, monkeypatch):
+    monkeypatch.setattr(research_manager, "LOW_TIME_SEARCH_WINDOW_SECONDS", 1.0)
+    monkeypatch.setattr(research_manager, "MIN_FETCH_WINDOW_SECONDS", 1.0)
+    page = b"<html><body><p>A fetched source page with enough words.</p></body></html>"
+    fixture_server.routes["/fast"] = {"body": page}
+    fixture_server.routes["/slow"] = {"body": page, "delay": 10}
+    ddgs.urls.update({"q0": fixture_server.url("/fast"), "q1": fixture_server.url("/slow")})
+
+    start = time.monotonic()
+    meta, _ = asyncio.run(_collect(manager, deadline=5))
+
+    assert time.monotonic() - start < 5
+    assert meta.pages_fetched == 1
+    assert "Read 1 of 2 source pages" in meta.cuts
+
+
+def test_runner_stops_once_deadline_passed(client):
+    budget = RunBudget(seconds=0)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(agents.Runner().run(
+            agent=research_manager.writer_agent,
+            messages=[{"role": "user", "content": "x"}],
+            budget=budget
+        ))
+
+    assert client.calls == []